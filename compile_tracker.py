@@ -0,0 +1,21 @@
+# Build the tracker_native extension module holding ahead-of-time compiled copies of the
+# association kernels in tracker_kernels.py, so the GUI does not pay Numba's JIT compile on its
+# first run. Run "python compile_tracker.py" from this directory, and again after editing the kernels.
+from numba.pycc import CC
+from tracker_kernels import KERNEL_CHECKSUM, associate, associate_scan
+
+cc = CC('tracker_native')
+
+cc.export('associate', 'i8(i8[:], f8, f8, f8, f8, f8, f8[:], f8[:], f8[:], f8[:], f8[:], i1[:], i8[:], '
+                       'f8, f8, f8, b1)')(associate.py_func)
+cc.export('associate_scan', 'i8[:](f8[:], f8[:], f8[:], f8[:], f8, i8[:], i8[:], i8, f8[:], f8[:], f8[:], '
+                            'f8[:], f8[:], f8, f8, f8, b1)')(associate_scan.py_func)
+
+# Checksum of the tracker_kernels.py the module was built from; the scripts only use the
+# module while it matches the current file
+@cc.export('kernel_checksum', 'i8()')
+def kernel_checksum():
+    return KERNEL_CHECKSUM
+
+if __name__ == '__main__':
+    cc.compile()
@@ -1,48 +1,84 @@
 import sys
+from collections import deque
+from itertools import islice
 import numpy as np
 import pandas as pd
+from scipy.spatial import cKDTree
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLabel, QLineEdit, 
                              QPushButton, QTextEdit, QFileDialog, QComboBox)
+from PyQt5.QtCore import QThread, pyqtSignal
+from tracker_kernels import KERNEL_CHECKSUM, associate, associate_scan
 
-# Convert spherical coordinates to Cartesian coordinates
+# Convert spherical coordinates to Cartesian coordinates (scalars or whole arrays)
 def sph2cart(az, el, r):
     az = np.radians(az)
     el = np.radians(el)
-    x = r * np.cos(el) * np.cos(az)
-    y = r * np.cos(el) * np.sin(az)
+    cos_el = np.cos(el)
+    x = r * cos_el * np.cos(az)
+    y = r * cos_el * np.sin(az)
     z = r * np.sin(el)
     return x, y, z
 
-# Check if the Doppler correlation is within the threshold
-def doppler_correlation(doppler_1, doppler_2, doppler_threshold):
-    return abs(doppler_1 - doppler_2) < doppler_threshold
+# Track states, stored on each track as a small integer ID
+STATE_POS, STATE_TENTATIVE, STATE_FIRM = 0, 1, 2
+STATE_NAMES = ['Pos', 'Tentative', 'Firm']
+STATE_ID = {name: state_id for state_id, name in enumerate(STATE_NAMES)}
 
-# Check if the distance is within the range threshold
-def range_gate(distance, range_threshold):
-    return distance < range_threshold
+# Number of misses after which a track in each state is released
+MISS_THRESHOLD = np.array([1, 2, 3], dtype=np.int8)
 
-# Get the next available track ID from the track list
-def get_next_track_id(track_id_list):
-    for idx, track in enumerate(track_id_list):
-        if track['state'] == 'free':
-            track_id_list[idx]['state'] = 'occupied'
-            return track['id'], idx
+# One row per measurement, with its Cartesian position precomputed
+MEASUREMENT_DTYPE = np.dtype([('az', 'f8'), ('el', 'f8'), ('r', 'f8'), ('doppler', 'f8'), ('time', 'f8'),
+                              ('x', 'f8'), ('y', 'f8'), ('z', 'f8')])
+
+# Initial number of track slots; the per-slot arrays double whenever they fill up
+TRACK_CAPACITY = 64
+
+# Shortlist candidate tracks with a kd-tree once this many are alive, rebuilding it
+# after this many track updates
+KDTREE_MIN_TRACKS = 2048
+KDTREE_REBUILD_INTERVAL = 2048
+
+# Drop the None left behind by released tracks once they make up more than this fraction of tracks
+TOMBSTONE_COMPACT_FRACTION = 0.25
+
+# Use the ahead-of-time compiled kernels when tracker_native was built from the current
+# tracker_kernels.py (see compile_tracker.py), which spares the first run the JIT compile;
+# otherwise keep the njit versions
+try:
+    import tracker_native
+except ImportError:
+    tracker_native = None
+if tracker_native is not None and tracker_native.kernel_checksum() == KERNEL_CHECKSUM:
+    associate, associate_scan = tracker_native.associate, tracker_native.associate_scan
+
+# Return a copy of a per-slot track array with its capacity doubled
+def grow_track_array(arr):
+    grown = np.zeros(2 * len(arr), dtype=arr.dtype)
+    grown[:len(arr)] = arr
+    return grown
+
+# Get the next available track ID, reusing a released one from the free list if possible
+def get_next_track_id(track_id_list, free_ids):
+    if free_ids:
+        idx = free_ids.popleft()
+        track_id_list[idx]['state'] = 'occupied'
+        return track_id_list[idx]['id'], idx
     new_id = len(track_id_list) + 1
     track_id_list.append({'id': new_id, 'state': 'occupied'})
     return new_id, len(track_id_list) - 1
 
-# Release a track ID by marking it as free
-def release_track_id(track_id_list, idx):
+# Release a track ID by marking it as free and queueing it for reuse
+def release_track_id(track_id_list, free_ids, idx):
     track_id_list[idx]['state'] = 'free'
+    free_ids.append(idx)
 
 # Main function for initializing tracks
-def initialize_tracks(measurements, doppler_threshold, range_threshold, firm_threshold, time_threshold, mode):
+def initialize_tracks(measurements, doppler_threshold, range_threshold, firm_threshold, time_threshold, mode,
+                      doppler_is_constant=False):
     tracks = []
     track_id_list = []
-    miss_counts = {}
-    hit_counts = {}
-    tentative_ids = {}
-    firm_ids = set()
+    free_ids = deque()  # Indices of free entries in track_id_list
 
     # Define the state progression based on the mode
     state_progression = {
@@ -50,87 +86,217 @@ def initialize_tracks(measurements, doppler_threshold, range_threshold, firm_thr
         5: ['Pos', 'Pos', 'Tentative', 'Tentative', 'Firm'],
         7: ['Pos', 'Pos', 'Tentative', 'Tentative', 'Tentative', 'Firm']
     }
-    progression_states = state_progression[firm_threshold]
-
-    for i, measurement in enumerate(measurements):
-        measurement_cartesian = sph2cart(measurement[0], measurement[1], measurement[2])
-        measurement_doppler = measurement[3]
-        measurement_time = measurement[4]
-
-        assigned = False
-
-        for track in tracks:
-            last_measurement = track['measurements'][-1]
-            last_cartesian = sph2cart(last_measurement[0], last_measurement[1], last_measurement[2])
-            last_doppler = last_measurement[3]
-            last_time = last_measurement[4]
-
-            distance = np.linalg.norm(np.array(measurement_cartesian) - np.array(last_cartesian))
-            doppler_correlated = doppler_correlation(measurement_doppler, last_doppler, doppler_threshold)
-            range_satisfied = range_gate(distance, range_threshold)
-            time_diff = measurement_time - last_time
-
-            if doppler_correlated and range_satisfied and time_diff <= time_threshold:
-                track['measurements'].append(measurement)
-                hit_counts[track['id']] += 1
-                miss_counts[track['id']] = 0  # Reset miss count on hit
-                
-                # Update the state based on hit counts
-                if hit_counts[track['id']] < len(progression_states):
-                    track['state'] = progression_states[hit_counts[track['id']] - 1]
-                if hit_counts[track['id']] >= firm_threshold:
-                    firm_ids.add(track['id'])
-                    track['state'] = 'Firm'
-                
-                assigned = True
-                break
-
-        if not assigned:
-            new_track_id, new_track_idx = get_next_track_id(track_id_list)
+    progression_states = np.array([STATE_ID[state] for state in state_progression[firm_threshold]], dtype=np.uint8)
+
+    # Cartesian coordinates are precomputed for the whole batch by the loader;
+    # plain Python floats keep the per-measurement kernel calls cheap
+    xs, ys, zs = measurements['x'].tolist(), measurements['y'].tolist(), measurements['z'].tolist()
+    dopplers = measurements['doppler'].tolist()
+    times = measurements['time'].tolist()
+    # The association kernels apply the gates inline and take the thresholds as floats
+    doppler_threshold = float(doppler_threshold)
+    range_threshold = float(range_threshold)
+    time_threshold = float(time_threshold)
+    # No distance is below a threshold <= 0; clamping it to 0 keeps the squared gate (and the
+    # kd-tree radius) rejecting every track instead of squaring a negative value into a real gate
+    range_threshold = max(range_threshold, 0.0)
+    range_threshold_sq = range_threshold * range_threshold
+    # A constant Doppler column passes every positive threshold, so the gate can be skipped
+    check_doppler = not (doppler_is_constant and doppler_threshold > 0)
+    x_arr, y_arr, z_arr = measurements['x'], measurements['y'], measurements['z']
+    doppler_arr = measurements['doppler']
+    points = np.column_stack((x_arr, y_arr, z_arr))
+
+    # Per-track hit/miss counts, firm flags and state IDs, indexed by the track's slot in track_id_list
+    hit_counts = np.zeros(TRACK_CAPACITY, dtype=np.int32)
+    miss_counts = np.zeros(TRACK_CAPACITY, dtype=np.int32)
+    is_firm = np.zeros(TRACK_CAPACITY, dtype=np.bool_)
+    state_ids = np.zeros(TRACK_CAPACITY, dtype=np.uint8)
+
+    # Last position, Doppler and time of every track, indexed by the same slot
+    track_x = np.zeros(TRACK_CAPACITY)
+    track_y = np.zeros(TRACK_CAPACITY)
+    track_z = np.zeros(TRACK_CAPACITY)
+    track_doppler = np.zeros(TRACK_CAPACITY)
+    track_time = np.zeros(TRACK_CAPACITY)
+    track_scan = np.full(TRACK_CAPACITY, -1, dtype=np.int64)  # Index of the last scan that hit the track
+    track_active = np.zeros(TRACK_CAPACITY, dtype=np.int8)
+    track_seq = np.zeros(TRACK_CAPACITY, dtype=np.int64)  # Creation order; association prefers the oldest track
+    n_created = 0
+
+    track_pos = {}  # Slot -> position in tracks; released tracks leave None behind until compaction
+    scan_time = None
+    scan = -1
+    scan_assignment = None  # Slot for each measurement of the scan when it was gated as a batch
+
+    tree = None  # kd-tree over track positions, built once enough tracks are alive
+    tree_slots = None  # Slot of each point in the tree
+    near_lists = None  # Tree points near each measurement from near_start up to near_stop
+    near_start = near_stop = 0
+    recent_slots = np.zeros(KDTREE_REBUILD_INTERVAL, dtype=np.int64)  # Slots updated since the tree was built
+    n_recent = 0
+
+    # Charge a miss to every live track that was not hit during the scan that just ended,
+    # and release the ones that reach the miss threshold of their state
+    def expire_missed_tracks():
+        n_slots = len(track_id_list)
+        missed = (track_active[:n_slots] != 0) & (track_scan[:n_slots] != scan)
+        misses = miss_counts[:n_slots]
+        misses[missed] += 1
+        expired = np.flatnonzero(missed & (misses >= MISS_THRESHOLD[state_ids[:n_slots]]))
+        track_active[expired] = 0
+        for slot in expired.tolist():
+            release_track_id(track_id_list, free_ids, slot)
+            tracks[track_pos.pop(slot)] = None
+
+        # track_pos holds only the live tracks, so the rest of tracks are tombstones
+        if len(tracks) - len(track_pos) > TOMBSTONE_COMPACT_FRACTION * len(tracks):
+            tracks[:] = [track for track in tracks if track is not None]
+            for pos, track in enumerate(tracks):
+                track_pos[track['slot']] = pos
+
+    # Loop-invariant lengths and the per-measurement values are bound to locals once
+    n_measurements = len(times)
+    n_progression = len(progression_states)
+    for i in range(n_measurements):
+        measurement_x = xs[i]
+        measurement_y = ys[i]
+        measurement_z = zs[i]
+        measurement_doppler = dopplers[i]
+        measurement_time = times[i]
+
+        # Measurements sharing a timestamp form one scan; misses are charged once the scan ends
+        if measurement_time != scan_time:
+            expire_missed_tracks()
+            scan_time = measurement_time
+            scan += 1
+            # A scan always holds its first row, even when its timestamp is NaN and matches nothing
+            scan_start = i
+            scan_stop = i + 1
+            while scan_stop < n_measurements and times[scan_stop] == scan_time:
+                scan_stop += 1
+            near_stop = i
+
+            # Associate the whole scan in one kernel call until there are enough tracks for the
+            # kd-tree to pay off; from then on measurements are gated one at a time. Either way a
+            # measurement can join a track hit or started earlier in the same scan.
+            scan_assignment = None
+            if tree is None and np.count_nonzero(track_active[:len(track_id_list)]) < KDTREE_MIN_TRACKS:
+                live_slots = np.flatnonzero(track_active[:len(track_id_list)])
+                live_slots = live_slots[np.argsort(track_seq[live_slots])]  # Oldest track first
+                free_slots = np.fromiter(islice(free_ids, scan_stop - scan_start), dtype=np.int64)
+                scan_assignment = associate_scan(
+                    x_arr[scan_start:scan_stop], y_arr[scan_start:scan_stop], z_arr[scan_start:scan_stop],
+                    doppler_arr[scan_start:scan_stop], scan_time, live_slots,
+                    free_slots, len(track_id_list), track_x, track_y, track_z, track_doppler, track_time,
+                    range_threshold_sq, doppler_threshold, time_threshold, check_doppler).tolist()
+
+        if scan_assignment is not None:
+            slot = scan_assignment[i - scan_start]
+        else:
+            # Index the live tracks once there are enough of them (the scan was not batched), and
+            # re-index them once too many have moved or been created since the tree was built
+            if tree is None or n_recent == KDTREE_REBUILD_INTERVAL:
+                tree_slots = np.flatnonzero(track_active[:len(track_id_list)])
+                tree = cKDTree(np.column_stack((track_x[tree_slots], track_y[tree_slots], track_z[tree_slots])))
+                n_recent = 0
+                near_stop = i
+
+            # Query the tree for a batch of upcoming measurements of the scan at once; the tree
+            # is rebuilt after at most KDTREE_REBUILD_INTERVAL of them anyway
+            if i >= near_stop:
+                near_stop = min(scan_stop, i + KDTREE_REBUILD_INTERVAL)
+                near_lists = tree.query_ball_point(points[i:near_stop], range_threshold)
+                near_start = i
+
+            # Attempt to assign the new measurement to an existing track, shortlisting candidates
+            # with the tree plus the slots it has not caught up with
+            candidates = np.concatenate((tree_slots[near_lists[i - near_start]], recent_slots[:n_recent]))
+            slot = associate(candidates, measurement_x, measurement_y, measurement_z, measurement_doppler,
+                             measurement_time, track_x, track_y, track_z, track_doppler, track_time, track_active,
+                             track_seq, range_threshold_sq, doppler_threshold, time_threshold, check_doppler)
+        assigned = slot >= 0
+
+        if assigned:
+            track = tracks[track_pos[slot]]
+            track['measurements'].append(i)
+            hit = hit_counts[slot] + 1
+            hit_counts[slot] = hit
+            miss_counts[slot] = 0  # Reset miss count on hit
+
+            # Update the state based on hit counts
+            if hit < n_progression:
+                state_ids[slot] = progression_states[hit - 1]
+            if hit >= firm_threshold:
+                is_firm[slot] = True
+                state_ids[slot] = STATE_FIRM
+        else:
+            new_track_id, slot = get_next_track_id(track_id_list, free_ids)
+            if slot >= len(track_active):
+                track_x = grow_track_array(track_x)
+                track_y = grow_track_array(track_y)
+                track_z = grow_track_array(track_z)
+                track_doppler = grow_track_array(track_doppler)
+                track_time = grow_track_array(track_time)
+                track_scan = grow_track_array(track_scan)
+                track_active = grow_track_array(track_active)
+                track_seq = grow_track_array(track_seq)
+                hit_counts = grow_track_array(hit_counts)
+                miss_counts = grow_track_array(miss_counts)
+                is_firm = grow_track_array(is_firm)
+                state_ids = grow_track_array(state_ids)
             new_track = {
                 'id': new_track_id,
-                'state': progression_states[0],
-                'measurements': [measurement]
+                'measurements': [i],
+                'slot': slot
             }
+            track_pos[slot] = len(tracks)
             tracks.append(new_track)
-            hit_counts[new_track_id] = 1
-            miss_counts[new_track_id] = 0
-
-        # Check miss counts and release the track if necessary
-        for track in tracks:
-            if not assigned and miss_counts.get(track['id'], 0) > 0:
-                miss_counts[track['id']] += 1  # Increment miss count if not assigned
-                
-                # Get current state of the track
-                current_state = track['state']
-                
-                # Determine miss threshold based on current state
-                if current_state == 'Pos':
-                    miss_threshold = 1
-                elif current_state == 'Tentative':
-                    miss_threshold = 2
-                elif current_state == 'Firm':
-                    miss_threshold = 3
-                else:
-                    miss_threshold = firm_threshold  # Fallback in case of unknown state
-
-                # Release the track if the miss count exceeds the threshold for its state
-                if miss_counts[track['id']] >= miss_threshold:
-                    release_track_id(track_id_list, track_id_list.index({'id': track['id'], 'state': 'occupied'}))
-                    tracks.remove(track)
-
-    return tracks, track_id_list, miss_counts, hit_counts, firm_ids
-
-# Load measurements from a CSV file
+            track_active[slot] = 1
+            track_seq[slot] = n_created
+            n_created += 1
+            hit_counts[slot] = 1
+            miss_counts[slot] = 0
+            is_firm[slot] = False
+            state_ids[slot] = progression_states[0]
+
+        # The measurement becomes the last point of the track it was assigned to
+        track_x[slot] = measurement_x
+        track_y[slot] = measurement_y
+        track_z[slot] = measurement_z
+        track_doppler[slot] = measurement_doppler
+        track_time[slot] = measurement_time
+        track_scan[slot] = scan
+        if tree is not None:
+            recent_slots[n_recent] = slot
+            n_recent += 1
+
+    # Close the final scan
+    expire_missed_tracks()
+
+    # Hand the surviving tracks back with their final state
+    tracks = [track for track in tracks if track is not None]
+    for track in tracks:
+        track['state_id'] = int(state_ids[track['slot']])
+    n_slots = len(track_id_list)
+    return tracks, track_id_list, miss_counts[:n_slots], hit_counts[:n_slots], is_firm[:n_slots]
+
+# Load measurements from a CSV file into a structured array, with Cartesian coordinates precomputed,
+# along with whether every measurement has the same Doppler
 def load_measurements_from_csv(file_path):
     df = pd.read_csv(file_path)
-    measurements = []
+    measurements = np.empty(len(df), dtype=MEASUREMENT_DTYPE)
+    measurements['az'] = df['azimuth'].to_numpy(dtype=float)
+    measurements['el'] = df['elevation'].to_numpy(dtype=float)
+    measurements['r'] = df['range'].to_numpy(dtype=float)
+    measurements['doppler'] = 1.0  # The CSV carries no Doppler column
+    measurements['time'] = df['timestamp'].to_numpy(dtype=float)
+    measurements['x'], measurements['y'], measurements['z'] = sph2cart(
+        measurements['az'], measurements['el'], measurements['r'])
 
-    for i in range(len(df)):
-        doppler = 1.0
-        measurements.append((df['azimuth'][i], df['elevation'][i], df['range'][i], doppler, df['timestamp'][i]))
-
-    return measurements
+    doppler = measurements['doppler']
+    doppler_is_constant = len(doppler) == 0 or bool(np.all(doppler == doppler[0]))
+    return measurements, doppler_is_constant
 
 # Select initiation mode based on user input
 def select_initiation_mode(mode):
@@ -143,6 +309,33 @@ def select_initiation_mode(mode):
     else:
         raise ValueError("Invalid initiation mode. Choose '3-state', '5-state', or '7-state'.")
 
+# Worker thread that loads the CSV and runs the tracker off the GUI thread
+class TrackWorker(QThread):
+    results_ready = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, file_path, doppler_threshold, range_threshold, firm_threshold, time_threshold, mode):
+        super().__init__()
+        self.file_path = file_path
+        self.params = (doppler_threshold, range_threshold, firm_threshold, time_threshold, mode)
+
+    def run(self):
+        try:
+            measurements, doppler_is_constant = load_measurements_from_csv(self.file_path)
+            tracks, track_id_list, miss_counts, hit_counts, is_firm = initialize_tracks(
+                measurements, *self.params, doppler_is_constant
+            )
+            self.results_ready.emit({
+                'measurements': measurements,
+                'tracks': tracks,
+                'track_id_list': track_id_list,
+                'miss_counts': miss_counts,
+                'hit_counts': hit_counts,
+                'is_firm': is_firm,
+            })
+        except Exception as e:
+            self.error.emit(str(e))
+
 # Main application class using PyQt5
 class TrackApp(QWidget):
     def __init__(self):
@@ -252,30 +445,35 @@ class TrackApp(QWidget):
     # Function to execute track initialization based on the user inputs
     def execute_track_initialization(self):
         try:
-            # Load the measurements from the selected CSV file
-            measurements = load_measurements_from_csv(self.file_path)
-
             # Get user inputs
+            file_path = self.file_path
             doppler_threshold = float(self.doppler_input.text())
             range_threshold = float(self.range_input.text())
             time_threshold = float(self.time_input.text())
             mode_text = self.mode_combo.currentText()
             firm_threshold = select_initiation_mode(mode_text)
+        except Exception as e:
+            self.output_text.setText(f"Error: {str(e)}")
+            return
 
-            # Initialize tracks based on the inputs
-            tracks, track_id_list, miss_counts, hit_counts, firm_ids = initialize_tracks(
-                measurements, doppler_threshold, range_threshold, firm_threshold, time_threshold, mode_text
-            )
+        # Load the measurements and initialize tracks on a worker thread so the window stays responsive
+        self.execute_button.setEnabled(False)
+        self.worker = TrackWorker(file_path, doppler_threshold, range_threshold, firm_threshold, time_threshold, mode_text)
+        self.worker.results_ready.connect(self.show_results)
+        self.worker.error.connect(self.show_error)
+        self.worker.finished.connect(lambda: self.execute_button.setEnabled(True))
+        self.worker.start()
 
-            # Output results to the output text box
-            output_str = "Track Initialization Completed!\n\n"
-            output_str += "Tracks:\n"
-            for track in tracks:
-                output_str += f"Track ID: {track['id']}, State: {track['state']}, Measurements: {len(track['measurements'])}\n"
-            self.output_text.setText(output_str)
+    # Function to output the tracker results to the output text box
+    def show_results(self, results):
+        lines = ["Track Initialization Completed!", "", "Tracks:"]
+        for track in results['tracks']:
+            lines.append(f"Track ID: {track['id']}, State: {STATE_NAMES[track['state_id']]}, Measurements: {len(track['measurements'])}")
+        self.output_text.setPlainText('\n'.join(lines))
 
-        except Exception as e:
-            self.output_text.setText(f"Error: {str(e)}")
+    # Function to report an error raised by the worker thread
+    def show_error(self, message):
+        self.output_text.setText(f"Error: {message}")
 
 
 # Main function to run the application
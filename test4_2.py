@@ -1,49 +1,81 @@
 import sys
+from collections import deque
+from itertools import islice
 import numpy as np
 import pandas as pd
+from scipy.spatial import cKDTree
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLabel, QLineEdit, 
                              QPushButton, QTextEdit, QFileDialog, QComboBox)
+from PyQt5.QtCore import QThread, pyqtSignal
+from tracker_kernels import KERNEL_CHECKSUM, associate, associate_scan
 
-# Convert spherical coordinates to Cartesian coordinates
+# Convert spherical coordinates to Cartesian coordinates (scalars or whole arrays)
 def sph2cart(az, el, r):
     az = np.radians(az)
     el = np.radians(el)
-    x = r * np.cos(el) * np.cos(az)
-    y = r * np.cos(el) * np.sin(az)
+    cos_el = np.cos(el)
+    x = r * cos_el * np.cos(az)
+    y = r * cos_el * np.sin(az)
     z = r * np.sin(el)
     return x, y, z
 
-# Check if the Doppler correlation is within the threshold
-def doppler_correlation(doppler_1, doppler_2, doppler_threshold):
-    return abs(doppler_1 - doppler_2) < doppler_threshold
-
-# Check if the distance is within the range threshold
-def range_gate(distance, range_threshold):
-    return distance < range_threshold
-
-# Get the next available track ID from the track list
-def get_next_track_id(track_id_list):
-    for idx, track in enumerate(track_id_list):
-        if track['state'] == 'free':
-            track_id_list[idx]['state'] = 'occupied'
-            return track['id'], idx
+# Track states, stored as small integer IDs
+STATE_POSS1, STATE_POSS2, STATE_TENTATIVE1, STATE_TENTATIVE2, STATE_TENTATIVE3, STATE_FIRM = range(6)
+STATE_NAMES = ['Poss1', 'Poss2', 'Tentative1', 'Tentative2', 'Tentative3', 'Firm']
+STATE_ID = {name: state_id for state_id, name in enumerate(STATE_NAMES)}
+
+# One row per measurement, with its Cartesian position precomputed
+MEASUREMENT_DTYPE = np.dtype([('az', 'f8'), ('el', 'f8'), ('r', 'f8'), ('doppler', 'f8'), ('time', 'f8'),
+                              ('x', 'f8'), ('y', 'f8'), ('z', 'f8')])
+
+# Initial number of track slots; the per-slot arrays double whenever they fill up
+TRACK_CAPACITY = 64
+
+# Shortlist candidate tracks with a kd-tree once this many are alive, rebuilding it
+# after this many track updates
+KDTREE_MIN_TRACKS = 2048
+KDTREE_REBUILD_INTERVAL = 2048
+
+# Drop the None left behind by released tracks once they make up more than this fraction of tracks
+TOMBSTONE_COMPACT_FRACTION = 0.25
+
+# Use the ahead-of-time compiled kernels when tracker_native was built from the current
+# tracker_kernels.py (see compile_tracker.py), which spares the first run the JIT compile;
+# otherwise keep the njit versions
+try:
+    import tracker_native
+except ImportError:
+    tracker_native = None
+if tracker_native is not None and tracker_native.kernel_checksum() == KERNEL_CHECKSUM:
+    associate, associate_scan = tracker_native.associate, tracker_native.associate_scan
+
+# Return a copy of a per-slot track array with its capacity doubled
+def grow_track_array(arr):
+    grown = np.zeros(2 * len(arr), dtype=arr.dtype)
+    grown[:len(arr)] = arr
+    return grown
+
+# Get the next available track ID, reusing a released one from the free list if possible
+def get_next_track_id(track_id_list, free_ids):
+    if free_ids:
+        idx = free_ids.popleft()
+        track_id_list[idx]['state'] = 'occupied'
+        return track_id_list[idx]['id'], idx
     new_id = len(track_id_list) + 1
     track_id_list.append({'id': new_id, 'state': 'occupied'})
     return new_id, len(track_id_list) - 1
 
-# Release a track ID by marking it as free
-def release_track_id(track_id_list, idx):
+# Release a track ID by marking it as free and queueing it for reuse
+def release_track_id(track_id_list, free_ids, idx):
     track_id_list[idx]['state'] = 'free'
+    free_ids.append(idx)
 
 # Main function for initializing tracks
-def initialize_tracks(measurements, doppler_threshold, range_threshold, firm_threshold, time_threshold, mode):
+def initialize_tracks(measurements, doppler_threshold, range_threshold, firm_threshold, time_threshold, mode,
+                      doppler_is_constant=False):
     tracks = []
     track_id_list = []
-    miss_counts = {}
-    hit_counts = {}
-    tentative_ids = {}
-    firm_ids = set()
-    state_map = {}  # Keeps track of the state of each track ID
+    free_ids = deque()  # Indices of free entries in track_id_list
 
     # Define the state progression based on the mode
     state_progression = {
@@ -51,109 +83,239 @@ def initialize_tracks(measurements, doppler_threshold, range_threshold, firm_thr
         5: ['Poss1', 'Poss2', 'Tentative1', 'Tentative2', 'Firm'],
         7: ['Poss1', 'Poss2', 'Tentative1', 'Tentative2', 'Tentative3', 'Firm']
     }
-    progression_states = state_progression[firm_threshold]
-
-    # Helper function to determine miss threshold based on the current state
-    def get_miss_threshold(current_state, firm_threshold):
-        if current_state.startswith('Poss'):
-            return 1  # For Poss1, delete after 1 miss
-        elif current_state.startswith('Tentative'):
-            return 2 if firm_threshold == 3 else 3  # Tentative, delete after 2 or 3 misses
-        elif current_state == 'Firm':
-            return 3 if firm_threshold == 3 else 5  # Firm, delete after 3 or 5 misses
-
-    for i, measurement in enumerate(measurements):
-        measurement_cartesian = sph2cart(measurement[0], measurement[1], measurement[2])
-        measurement_doppler = measurement[3]
-        measurement_time = measurement[4]
-
-        assigned = False
-
-        # Iterate through existing tracks and attempt to assign the new measurement
-        for track_id, track in enumerate(tracks):
-            if not track:  # Skip tracks that have been released (set to None)
-                continue
-
-            last_measurement = track['measurements'][-1][0]  # Only extract the measurement part
-            last_cartesian = sph2cart(last_measurement[0], last_measurement[1], last_measurement[2])
-            last_doppler = last_measurement[3]
-            last_time = last_measurement[4]
-
-            distance = np.linalg.norm(np.array(measurement_cartesian) - np.array(last_cartesian))
-            doppler_correlated = doppler_correlation(measurement_doppler, last_doppler, doppler_threshold)
-            range_satisfied = range_gate(distance, range_threshold)
-            time_diff = measurement_time - last_time
-
-            if doppler_correlated and range_satisfied and time_diff <= time_threshold:
-                # Track ID assignment logic
-                if track_id not in firm_ids:
-                    if track_id in tentative_ids:
-                        hit_counts[track_id] += 1
-                        miss_counts[track_id] = 0  # Reset miss count on hit
-                        
-                        # Update the state based on hit counts
-                        if hit_counts[track_id] < len(progression_states):
-                            state_map[track_id] = progression_states[hit_counts[track_id] - 1]
-                        if hit_counts[track_id] >= firm_threshold:
-                            firm_ids.add(track_id)
-                            state_map[track_id] = 'Firm'
-                    else:
-                        tentative_ids[track_id] = True
-                        hit_counts[track_id] = 1
-                        miss_counts[track_id] = 0
-                        state_map[track_id] = progression_states[0]
-                
-                # Append measurement to the track along with its current state
-                track['measurements'].append((measurement, state_map[track_id]))
-                assigned = True
-                break
-
-        if not assigned:
+    progression_states = np.array([STATE_ID[state] for state in state_progression[firm_threshold]], dtype=np.uint8)
+
+    # Number of misses after which a track in each state is released: Poss after 1,
+    # Tentative after 2 (3-state) or 3, Firm after 3 (3-state) or 5
+    if firm_threshold == 3:
+        miss_thresholds = np.array([1, 1, 2, 2, 2, 3], dtype=np.int8)
+    else:
+        miss_thresholds = np.array([1, 1, 3, 3, 3, 5], dtype=np.int8)
+
+    # Cartesian coordinates are precomputed for the whole batch by the loader;
+    # plain Python floats keep the per-measurement kernel calls cheap
+    xs, ys, zs = measurements['x'].tolist(), measurements['y'].tolist(), measurements['z'].tolist()
+    dopplers = measurements['doppler'].tolist()
+    times = measurements['time'].tolist()
+    # The association kernels apply the gates inline and take the thresholds as floats
+    doppler_threshold = float(doppler_threshold)
+    range_threshold = float(range_threshold)
+    time_threshold = float(time_threshold)
+    # No distance is below a threshold <= 0; clamping it to 0 keeps the squared gate (and the
+    # kd-tree radius) rejecting every track instead of squaring a negative value into a real gate
+    range_threshold = max(range_threshold, 0.0)
+    range_threshold_sq = range_threshold * range_threshold
+    # A constant Doppler column passes every positive threshold, so the gate can be skipped
+    check_doppler = not (doppler_is_constant and doppler_threshold > 0)
+    x_arr, y_arr, z_arr = measurements['x'], measurements['y'], measurements['z']
+    doppler_arr = measurements['doppler']
+    points = np.column_stack((x_arr, y_arr, z_arr))
+
+    # Per-track hit/miss counts, tentative/firm flags and state IDs, indexed by the track's
+    # slot in track_id_list
+    hit_counts = np.zeros(TRACK_CAPACITY, dtype=np.int32)
+    miss_counts = np.zeros(TRACK_CAPACITY, dtype=np.int32)
+    is_tentative = np.zeros(TRACK_CAPACITY, dtype=np.bool_)
+    is_firm = np.zeros(TRACK_CAPACITY, dtype=np.bool_)
+    state_ids = np.zeros(TRACK_CAPACITY, dtype=np.uint8)
+
+    # Last position, Doppler and time of every track, indexed by the same slot
+    track_x = np.zeros(TRACK_CAPACITY)
+    track_y = np.zeros(TRACK_CAPACITY)
+    track_z = np.zeros(TRACK_CAPACITY)
+    track_doppler = np.zeros(TRACK_CAPACITY)
+    track_time = np.zeros(TRACK_CAPACITY)
+    track_scan = np.full(TRACK_CAPACITY, -1, dtype=np.int64)  # Index of the last scan that hit the track
+    track_active = np.zeros(TRACK_CAPACITY, dtype=np.int8)
+    track_seq = np.zeros(TRACK_CAPACITY, dtype=np.int64)  # Creation order; association prefers the oldest track
+    n_created = 0
+
+    track_pos = {}  # Slot -> position in tracks; released tracks are set to None until compaction
+    scan_time = None
+    scan = -1
+    scan_assignment = None  # Slot for each measurement of the scan when it was gated as a batch
+
+    tree = None  # kd-tree over track positions, built once enough tracks are alive
+    tree_slots = None  # Slot of each point in the tree
+    near_lists = None  # Tree points near each measurement from near_start up to near_stop
+    near_start = near_stop = 0
+    recent_slots = np.zeros(KDTREE_REBUILD_INTERVAL, dtype=np.int64)  # Slots updated since the tree was built
+    n_recent = 0
+
+    # Charge a miss to every live track that was not hit during the scan that just ended,
+    # and release the ones that reach the miss threshold of their state
+    def expire_missed_tracks():
+        n_slots = len(track_id_list)
+        missed = (track_active[:n_slots] != 0) & (track_scan[:n_slots] != scan)
+        misses = miss_counts[:n_slots]
+        misses[missed] += 1
+        expired = np.flatnonzero(missed & (misses >= miss_thresholds[state_ids[:n_slots]]))
+        track_active[expired] = 0
+        for slot in expired.tolist():
+            release_track_id(track_id_list, free_ids, slot)
+            tracks[track_pos.pop(slot)] = None
+
+        # track_pos holds only the live tracks, so the rest of tracks are tombstones
+        if len(tracks) - len(track_pos) > TOMBSTONE_COMPACT_FRACTION * len(tracks):
+            tracks[:] = [track for track in tracks if track is not None]
+            for pos, track in enumerate(tracks):
+                track_pos[track['slot']] = pos
+
+    # Loop-invariant lengths and the per-measurement values are bound to locals once
+    n_measurements = len(times)
+    n_progression = len(progression_states)
+    for i in range(n_measurements):
+        measurement_x = xs[i]
+        measurement_y = ys[i]
+        measurement_z = zs[i]
+        measurement_doppler = dopplers[i]
+        measurement_time = times[i]
+
+        # Measurements sharing a timestamp form one scan; misses are charged once the scan ends
+        if measurement_time != scan_time:
+            expire_missed_tracks()
+            scan_time = measurement_time
+            scan += 1
+            # A scan always holds its first row, even when its timestamp is NaN and matches nothing
+            scan_start = i
+            scan_stop = i + 1
+            while scan_stop < n_measurements and times[scan_stop] == scan_time:
+                scan_stop += 1
+            near_stop = i
+
+            # Associate the whole scan in one kernel call until there are enough tracks for the
+            # kd-tree to pay off; from then on measurements are gated one at a time. Either way a
+            # measurement can join a track hit or started earlier in the same scan.
+            scan_assignment = None
+            if tree is None and np.count_nonzero(track_active[:len(track_id_list)]) < KDTREE_MIN_TRACKS:
+                live_slots = np.flatnonzero(track_active[:len(track_id_list)])
+                live_slots = live_slots[np.argsort(track_seq[live_slots])]  # Oldest track first
+                free_slots = np.fromiter(islice(free_ids, scan_stop - scan_start), dtype=np.int64)
+                scan_assignment = associate_scan(
+                    x_arr[scan_start:scan_stop], y_arr[scan_start:scan_stop], z_arr[scan_start:scan_stop],
+                    doppler_arr[scan_start:scan_stop], scan_time, live_slots,
+                    free_slots, len(track_id_list), track_x, track_y, track_z, track_doppler, track_time,
+                    range_threshold_sq, doppler_threshold, time_threshold, check_doppler).tolist()
+
+        if scan_assignment is not None:
+            slot = scan_assignment[i - scan_start]
+        else:
+            # Index the live tracks once there are enough of them (the scan was not batched), and
+            # re-index them once too many have moved or been created since the tree was built
+            if tree is None or n_recent == KDTREE_REBUILD_INTERVAL:
+                tree_slots = np.flatnonzero(track_active[:len(track_id_list)])
+                tree = cKDTree(np.column_stack((track_x[tree_slots], track_y[tree_slots], track_z[tree_slots])))
+                n_recent = 0
+                near_stop = i
+
+            # Query the tree for a batch of upcoming measurements of the scan at once; the tree
+            # is rebuilt after at most KDTREE_REBUILD_INTERVAL of them anyway
+            if i >= near_stop:
+                near_stop = min(scan_stop, i + KDTREE_REBUILD_INTERVAL)
+                near_lists = tree.query_ball_point(points[i:near_stop], range_threshold)
+                near_start = i
+
+            # Attempt to assign the new measurement to an existing track, shortlisting candidates
+            # with the tree plus the slots it has not caught up with
+            candidates = np.concatenate((tree_slots[near_lists[i - near_start]], recent_slots[:n_recent]))
+            slot = associate(candidates, measurement_x, measurement_y, measurement_z, measurement_doppler,
+                             measurement_time, track_x, track_y, track_z, track_doppler, track_time, track_active,
+                             track_seq, range_threshold_sq, doppler_threshold, time_threshold, check_doppler)
+        assigned = slot >= 0
+
+        if assigned:
+            miss_counts[slot] = 0  # Every hit resets the miss count, firm tracks included
+
+            # Track ID assignment logic
+            if not is_firm[slot]:
+                if is_tentative[slot]:
+                    hit = hit_counts[slot] + 1
+                    hit_counts[slot] = hit
+
+                    # Update the state based on hit counts
+                    if hit < n_progression:
+                        state_ids[slot] = progression_states[hit - 1]
+                    if hit >= firm_threshold:
+                        is_firm[slot] = True
+                        state_ids[slot] = STATE_FIRM
+                else:
+                    is_tentative[slot] = True
+                    hit_counts[slot] = 1
+                    state_ids[slot] = progression_states[0]
+
+            # Append measurement to the track along with its current state
+            tracks[track_pos[slot]]['measurements'].append((i, state_ids[slot]))
+        else:
             # Create a new track if no existing track was assigned
-            new_track_id, new_track_idx = get_next_track_id(track_id_list)
+            new_track_id, slot = get_next_track_id(track_id_list, free_ids)
+            if slot >= len(track_active):
+                track_x = grow_track_array(track_x)
+                track_y = grow_track_array(track_y)
+                track_z = grow_track_array(track_z)
+                track_doppler = grow_track_array(track_doppler)
+                track_time = grow_track_array(track_time)
+                track_scan = grow_track_array(track_scan)
+                track_active = grow_track_array(track_active)
+                track_seq = grow_track_array(track_seq)
+                hit_counts = grow_track_array(hit_counts)
+                miss_counts = grow_track_array(miss_counts)
+                is_tentative = grow_track_array(is_tentative)
+                is_firm = grow_track_array(is_firm)
+                state_ids = grow_track_array(state_ids)
+            track_pos[slot] = len(tracks)
             tracks.append({
                 'track_id': new_track_id,
-                'measurements': [(measurement, progression_states[0])]  # Start with the first state
+                'measurements': [(i, progression_states[0])],  # Start with the first state
+                'slot': slot
             })
-            miss_counts[new_track_idx] = 0
-            hit_counts[new_track_idx] = 1
-            tentative_ids[new_track_idx] = True
-            state_map[new_track_idx] = progression_states[0]
-
-        # Check miss counts and release the track if necessary
-        for track_id, track in enumerate(tracks):
-            if not track:  # Skip over already released tracks
-                continue
-
-            # Get current state of the track
-            current_state = state_map.get(track_id)
-
-            # Determine miss threshold based on current state
-            miss_threshold = get_miss_threshold(current_state, firm_threshold)
-
-            # If this track wasn't assigned this time, increment its miss count
-            if not assigned and track['track_id'] == new_track_id:
-                miss_counts[track_id] += 1
-
-            # Release the track if the miss count exceeds the threshold for its state
-            if miss_counts[track_id] >= miss_threshold:
-                tracks[track_id] = None  # Clear the track
-                release_track_id(track_id_list, track_id)
-                state_map.pop(track_id, None)  # Remove state from state_map
-
-    return tracks, track_id_list, miss_counts, hit_counts, firm_ids, state_map, progression_states
-
-
-# Load measurements from a CSV file
+            track_active[slot] = 1
+            track_seq[slot] = n_created
+            n_created += 1
+            miss_counts[slot] = 0
+            hit_counts[slot] = 1
+            is_tentative[slot] = True
+            is_firm[slot] = False  # The slot may have belonged to a released firm track
+            state_ids[slot] = progression_states[0]
+
+        # The measurement becomes the last point of the track it was assigned to
+        track_x[slot] = measurement_x
+        track_y[slot] = measurement_y
+        track_z[slot] = measurement_z
+        track_doppler[slot] = measurement_doppler
+        track_time[slot] = measurement_time
+        track_scan[slot] = scan
+        if tree is not None:
+            recent_slots[n_recent] = slot
+            n_recent += 1
+
+    # Close the final scan
+    expire_missed_tracks()
+
+    n_slots = len(track_id_list)
+    return (tracks, track_id_list, miss_counts[:n_slots], hit_counts[:n_slots], is_firm[:n_slots],
+            state_ids[:n_slots], progression_states)
+
+
+# Load measurements from a CSV file into a structured array, with Cartesian coordinates precomputed,
+# along with whether every measurement has the same Doppler
 def load_measurements_from_csv(file_path):
     df = pd.read_csv(file_path)
-    measurements = []
-
-    for i in range(len(df)):
-        doppler = 1.0
-        measurements.append((df['azimuth'][i], df['elevation'][i], df['range'][i], doppler, df['timestamp'][i]))
-
-    return measurements
+    measurements = np.empty(len(df), dtype=MEASUREMENT_DTYPE)
+    measurements['az'] = df['azimuth'].to_numpy(dtype=float)
+    measurements['el'] = df['elevation'].to_numpy(dtype=float)
+    measurements['r'] = df['range'].to_numpy(dtype=float)
+    measurements['doppler'] = 1.0  # The CSV carries no Doppler column
+    measurements['time'] = df['timestamp'].to_numpy(dtype=float)
+    measurements['x'], measurements['y'], measurements['z'] = sph2cart(
+        measurements['az'], measurements['el'], measurements['r'])
+
+    doppler = measurements['doppler']
+    doppler_is_constant = len(doppler) == 0 or bool(np.all(doppler == doppler[0]))
+    return measurements, doppler_is_constant
+
+# Rebuild the (azimuth, elevation, range, doppler, timestamp) tuple of one measurement for display
+def measurement_tuple(measurements, idx):
+    return measurements[['az', 'el', 'r', 'doppler', 'time']][idx].tolist()
 
 # Select initiation mode based on user input
 def select_initiation_mode(mode):
@@ -167,6 +329,36 @@ def select_initiation_mode(mode):
         raise ValueError("Invalid initiation mode. Choose '3-state', '5-state', or '7-state'.")
 
 
+# Worker thread that loads the CSV and runs the tracker off the GUI thread
+class TrackWorker(QThread):
+    results_ready = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, file_path, doppler_threshold, range_threshold, firm_threshold, time_threshold, mode):
+        super().__init__()
+        self.file_path = file_path
+        self.params = (doppler_threshold, range_threshold, firm_threshold, time_threshold, mode)
+
+    def run(self):
+        try:
+            measurements, doppler_is_constant = load_measurements_from_csv(self.file_path)
+            tracks, track_id_list, miss_counts, hit_counts, is_firm, state_ids, progression_states = initialize_tracks(
+                measurements, *self.params, doppler_is_constant
+            )
+            self.results_ready.emit({
+                'measurements': measurements,
+                'tracks': tracks,
+                'track_id_list': track_id_list,
+                'miss_counts': miss_counts,
+                'hit_counts': hit_counts,
+                'is_firm': is_firm,
+                'state_ids': state_ids,
+                'progression_states': progression_states,
+            })
+        except Exception as e:
+            self.error.emit(str(e))
+
+
 # Main application class using PyQt5
 class TrackApp(QWidget):
     def __init__(self):
@@ -282,38 +474,48 @@ class TrackApp(QWidget):
 
             # Select initiation mode
             firm_threshold = select_initiation_mode(mode)
-
-            # Load measurements from the selected CSV file
-            measurements = load_measurements_from_csv(file_path)
-
-            # Initialize tracks and get progression_states
-            tracks, track_id_list, miss_counts, hit_counts, firm_ids, state_map, progression_states = initialize_tracks(
-                measurements, doppler_threshold, range_threshold, firm_threshold, time_threshold, mode
-            )
-
-            # Display output in the text box
-            output = ''
-            for track in tracks:
-                if track:
-                    output += f"Track ID {track['track_id']}:\n"
-                    for measurement, state in track['measurements']:
-                        output += f"  Measurement: {measurement}, State: {state}\n"
-                    output += f"  Total Hits: {hit_counts.get(track['track_id'], 0)}, Total Misses: {miss_counts.get(track['track_id'], 0)}\n"
-                    
-                    # Firm check
-                    if track['track_id'] in firm_ids:
-                        output += f"  Track ID {track['track_id']} is firm.\n"
-                    else:
-                        output += f"  Track ID {track['track_id']} is tentative.\n"
-
-            # Display track ID statuses (free/occupied)
-            for idx, track_info in enumerate(track_id_list):
-                output += f"Track ID {track_info['id']} is {track_info['state']}.\n"
-
-            self.output_text.append(output)  # Append new results to the output box
-        
         except Exception as e:
             self.output_text.append(f"Error: {e}")
+            return
+
+        # Load measurements and initialize tracks on a worker thread so the window stays responsive
+        self.execute_button.setEnabled(False)
+        self.worker = TrackWorker(file_path, doppler_threshold, range_threshold, firm_threshold, time_threshold, mode)
+        self.worker.results_ready.connect(self.show_results)
+        self.worker.error.connect(self.show_error)
+        self.worker.finished.connect(lambda: self.execute_button.setEnabled(True))
+        self.worker.start()
+
+    # Display the tracker results in the text box
+    def show_results(self, results):
+        measurements = results['measurements']
+        hit_counts = results['hit_counts']
+        miss_counts = results['miss_counts']
+        is_firm = results['is_firm']
+
+        lines = []
+        for track in results['tracks']:
+            if track:
+                lines.append(f"Track ID {track['track_id']}:")
+                for idx, state in track['measurements']:
+                    lines.append(f"  Measurement: {measurement_tuple(measurements, idx)}, State: {STATE_NAMES[state]}")
+                lines.append(f"  Total Hits: {hit_counts[track['slot']]}, Total Misses: {miss_counts[track['slot']]}")
+
+                # Firm check
+                if is_firm[track['slot']]:
+                    lines.append(f"  Track ID {track['track_id']} is firm.")
+                else:
+                    lines.append(f"  Track ID {track['track_id']} is tentative.")
+
+        # Display track ID statuses (free/occupied)
+        for track_info in results['track_id_list']:
+            lines.append(f"Track ID {track_info['id']} is {track_info['state']}.")
+
+        self.output_text.append('\n'.join(lines))  # Append new results to the output box
+
+    # Report an error raised by the worker thread
+    def show_error(self, message):
+        self.output_text.append(f"Error: {message}")
     
     # Clear the output text box
     def clear_output(self):
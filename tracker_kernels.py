@@ -0,0 +1,91 @@
+# Numba kernels shared by test1.py and test4_2.py and compiled ahead of time by compile_tracker.py.
+# Keep this module free of Qt so the build script can import it.
+import zlib
+import numpy as np
+from numba import njit
+
+# Checksum of this file, recorded in the tracker_native build so a build made from older kernels
+# is never used in place of these
+with open(__file__, 'rb') as kernel_file:
+    KERNEL_CHECKSUM = zlib.crc32(kernel_file.read())
+
+# Find the oldest (lowest track_seq) active candidate slot gated by the measurement in range,
+# Doppler and time, or -1. The Doppler gate is only applied when check_doppler is set.
+@njit(cache=True)
+def associate(candidates, mx, my, mz, md, mt, track_x, track_y, track_z, track_doppler, track_time,
+              track_active, track_seq, range_threshold_sq, doppler_threshold, time_threshold, check_doppler):
+    best = -1
+    for slot in candidates:
+        if not track_active[slot] or (best >= 0 and track_seq[slot] > track_seq[best]):
+            continue
+        dx = mx - track_x[slot]
+        dy = my - track_y[slot]
+        dz = mz - track_z[slot]
+        if (dx * dx + dy * dy + dz * dz < range_threshold_sq
+                and (not check_doppler or abs(md - track_doppler[slot]) < doppler_threshold)
+                and mt - track_time[slot] <= time_threshold):
+            best = slot
+    return best
+
+# Associate every measurement of a scan, in order, exactly as one associate call per measurement
+# would: each takes the oldest gated track among the live tracks (candidates, oldest first) and
+# the tracks started earlier in the scan, and tracks hit earlier in the scan are gated at their
+# updated last point. Returns the slot for each measurement, or -1 where it starts a track; new
+# tracks take the slots that get_next_track_id will hand out, i.e. free_slots first and then
+# n_slots, n_slots + 1, ...
+@njit(cache=True)
+def associate_scan(mx, my, mz, md, mt, candidates, free_slots, n_slots, track_x, track_y, track_z,
+                   track_doppler, track_time, range_threshold_sq, doppler_threshold, time_threshold,
+                   check_doppler):
+    n_rows = len(mx)
+    n_candidates = len(candidates)
+    assignment = np.full(n_rows, -1, dtype=np.int64)
+
+    # Slot and last point of every track the scan can join, oldest first; the tracks it starts are
+    # the newest and go at the end
+    pool_size = n_candidates + n_rows
+    pool_slot = np.empty(pool_size, dtype=np.int64)
+    pool_x = np.empty(pool_size)
+    pool_y = np.empty(pool_size)
+    pool_z = np.empty(pool_size)
+    pool_doppler = np.empty(pool_size)
+    pool_time = np.empty(pool_size)
+    for k in range(n_candidates):
+        slot = candidates[k]
+        pool_slot[k] = slot
+        pool_x[k] = track_x[slot]
+        pool_y[k] = track_y[slot]
+        pool_z[k] = track_z[slot]
+        pool_doppler[k] = track_doppler[slot]
+        pool_time[k] = track_time[slot]
+    n_pool = n_candidates
+
+    for row in range(n_rows):
+        best = -1
+        for k in range(n_pool):
+            dx = mx[row] - pool_x[k]
+            dy = my[row] - pool_y[k]
+            dz = mz[row] - pool_z[k]
+            if (dx * dx + dy * dy + dz * dz < range_threshold_sq
+                    and (not check_doppler or abs(md[row] - pool_doppler[k]) < doppler_threshold)
+                    and mt - pool_time[k] <= time_threshold):
+                best = k
+                break
+        if best >= 0:
+            assignment[row] = pool_slot[best]
+        else:
+            best = n_pool
+            n_new = n_pool - n_candidates
+            if n_new < len(free_slots):
+                pool_slot[best] = free_slots[n_new]
+            else:
+                pool_slot[best] = n_slots + n_new - len(free_slots)
+            n_pool += 1
+
+        # The measurement becomes the last point of the track it joined or started
+        pool_x[best] = mx[row]
+        pool_y[best] = my[row]
+        pool_z[best] = mz[row]
+        pool_doppler[best] = md[row]
+        pool_time[best] = mt
+    return assignment